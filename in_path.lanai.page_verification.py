@@ -1,7 +1,7 @@
 # $Id: page_verification.py 16885 2014-03-27 19:00:33Z lkhaimovich $
 #
 
-import re, logging, string
+import logging
 from nbt.ui.sh.configure.optimization.in_path.malta.page_verification \
     import PageVerification as Base
 
@@ -14,9 +14,18 @@ def translate_VLAN(vlan=None):
     if vlan is None:
         vlan = 'All'
     else:
-        vlan = string.capitalize(str(vlan))
+        vlan = str(vlan).capitalize()
     return vlan
 
+#   Shared VLAN cell for rules without a VLAN tag. Read-only: it is the same
+#   list object in every expected row, so never mutate it.
+_VLAN_ALL_CELL = [translate_VLAN()]
+
+def _vlan_cell(vlan_id):
+    if vlan_id is None:
+        return _VLAN_ALL_CELL
+    return [translate_VLAN(vlan=vlan_id)]
+
 
 class PageVerification(Base):
     """
@@ -38,7 +47,14 @@ class PageVerification(Base):
             widgets = appliance.get_widgets("configure.optimization.in_path")
         self.widgets = widgets
         Base.__init__(self, test, appliance, widgets=widgets, page=page)
-    
+        #   Maps type_of_rule to the method that builds its expected row
+        self._rule_dispatch = {
+            "Auto Discover": self.expected_auto_discover_rule,
+            "Fixed-Target": self.expected_fixed_target_rule,
+            "Pass Through": self.expected_pass_through_rule,
+            "Discard": self.expected_discard_rule,
+            "Deny": self.expected_deny_rule}
+
     def expected_rule(self, number_of_rules=None, **kwords):
         """
         Generate expected state of in-path rule
@@ -48,28 +64,11 @@ class PageVerification(Base):
         """
         #   We just pass through the whole data distionary and let each
         #   method handle them as they see fit
-        if kwords['type_of_rule'] == "Auto Discover":
-            expected_row = self.expected_auto_discover_rule(
-                number_of_rules=number_of_rules, **kwords)
-
-        elif kwords['type_of_rule'] == "Fixed-Target":
-            expected_row = self.expected_fixed_target_rule(
-                number_of_rules=number_of_rules, **kwords)
-
-        elif kwords['type_of_rule'] == "Pass Through":
-            expected_row = self.expected_pass_through_rule(
-                number_of_rules=number_of_rules, **kwords)
-
-        elif kwords['type_of_rule'] == "Discard":
-            expected_row = self.expected_discard_rule(
-                number_of_rules=number_of_rules, **kwords)
-
-        elif kwords['type_of_rule'] == "Deny":
-            expected_row = self.expected_deny_rule(
-                number_of_rules=number_of_rules, **kwords)
-
-        else:
+        handler = self._rule_dispatch.get(kwords['type_of_rule'])
+        if handler is None:
             self.log.info("Not a valid type")
+        else:
+            expected_row = handler(number_of_rules=number_of_rules, **kwords)
 
         expected_data = []
         expected_data.append(expected_row)
@@ -79,7 +78,7 @@ class PageVerification(Base):
             expected_data.append([description_row])
 
         return expected_data
-    
+
     def __expected_rule_prefix(self,
                                type_of_rule,
                                position,
@@ -94,22 +93,47 @@ class PageVerification(Base):
         # source_subnet      - source subnet
         # destination_subnet - destination subnet
         # destination_port   - destination port
-        
+
         # Substituting 'all' and 'All' port names with '*', to simulate
         # the formatting performed by WebUI.
-        patc = re.compile(r'\Aall\Z', re.IGNORECASE)
-        m_source = patc.match(source_port)
-        m_destination = patc.match(destination_port)
-        if m_source:
+        if source_port.lower() == 'all':
             source_port = '*'
-        if m_destination:
+        if destination_port.lower() == 'all':
             destination_port = '*'
 
         source = str(source_subnet) + ':' + str(source_port)
         destination = str(destination_subnet) + ':' + str(destination_port)
-        
+
         return [[str(position)], [type_of_rule], [source], [destination]]
 
+    def __expected_rule_suffix(self,
+                               vlan_id,
+                               protocol,
+                               preoptimization_policy,
+                               latency_optimization_policy,
+                               optimization_policy,
+                               cloud_acceleration,
+                               kickoff,
+                               status):
+        # Generate common trailing elements for all the rules
+        # vlan_id                     - VLAN tag id
+        # protocol                    - the protocol used
+        # preoptimization_policy      - preoptimization policy
+        # latency_optimization_policy - latency optimization policy
+        # optimization_policy         - optimization policy
+        # cloud_acceleration          - cloud acceleration select option
+        # kickoff                     - kickoff column text
+        # status                      - whether enabled or not
+
+        return [_vlan_cell(vlan_id),
+                [protocol],
+                [preoptimization_policy],
+                [latency_optimization_policy],
+                [optimization_policy],
+                [cloud_acceleration],
+                [kickoff],
+                [status]]
+
     def expected_auto_discover_rule(self,
                                     number_of_rules=None,
                                     position=None,
@@ -124,7 +148,7 @@ class PageVerification(Base):
                                     protocol='--',
                                     auto_kickoff=None,
                                     status='Enabled',
-				    cloud_acceleration="Auto",
+                                    cloud_acceleration="Auto",
                                     **kwords):
         """
         Generate expected auto discover rule.
@@ -152,23 +176,16 @@ class PageVerification(Base):
         expected_row = self.__expected_rule_prefix(
             'Auto Discover', position, source_subnet, source_port,
             destination_subnet, destination_port)
-         
+
         if optimization_policy == "Compression-Only":
             optimization_policy = "Compr-Only"
 
-        if (auto_kickoff is not None and auto_kickoff):
-		kickoff = "Yes"
-	else:
-		kickoff = "No"
-	expected_row.extend([[translate_VLAN(vlan=vlan_id)],
-                             [protocol],
-                             [preoptimization_policy],
-                             [latency_optimization_policy],
-                             [optimization_policy],
-                             [cloud_acceleration],
-			     [kickoff],
-                             [status]])
-                         
+        kickoff = (KICKOFF_FALSE, KICKOFF_TRUE)[bool(auto_kickoff)]
+        expected_row.extend(self.__expected_rule_suffix(
+            vlan_id, protocol, preoptimization_policy,
+            latency_optimization_policy, optimization_policy,
+            cloud_acceleration, kickoff, status))
+
         return expected_row
 
     def expected_fixed_target_rule(self,
@@ -185,7 +202,7 @@ class PageVerification(Base):
                                    protocol='--',
                                    auto_kickoff=None,
                                    status='Enabled',
-				   cloud_acceleration=None,
+                                   cloud_acceleration=None,
                                    **kwords):
         """
         Generate expected fixed target rule
@@ -213,23 +230,15 @@ class PageVerification(Base):
         expected_row = self.__expected_rule_prefix(
             'Fixed-Target', position, source_subnet, source_port,
             destination_subnet, destination_port)
-         
+
         if optimization_policy == "Compression-Only":
             optimization_policy = "Compr-Only"
-	if (auto_kickoff is not None and auto_kickoff):
-                kickoff = "Yes"
-        else:
-                kickoff = "No"
-	cloud_acceleration = "--"
-        expected_row.extend([[translate_VLAN(vlan=vlan_id)],
-                             [protocol],
-                             [preoptimization_policy],
-                             [latency_optimization_policy],
-                             [optimization_policy],
-                             [cloud_acceleration],
-                             [kickoff],
-                             [status]])
-	
+        kickoff = (KICKOFF_FALSE, KICKOFF_TRUE)[bool(auto_kickoff)]
+        expected_row.extend(self.__expected_rule_suffix(
+            vlan_id, protocol, preoptimization_policy,
+            latency_optimization_policy, optimization_policy,
+            "--", kickoff, status))
+
         return expected_row
 
     def expected_pass_through_rule(self,
@@ -242,7 +251,7 @@ class PageVerification(Base):
                                    vlan_id=None,
                                    protocol='TCP',
                                    status='Enabled',
-				   cloud_acceleration="Auto",
+                                   cloud_acceleration="Auto",
                                    **kwords):
         """
         Generate expected pass through rule
@@ -264,22 +273,12 @@ class PageVerification(Base):
         expected_row = self.__expected_rule_prefix(
             'Pass Through', position, source_subnet, source_port,
             destination_subnet, destination_port)
-         
-        preoptimization_policy = "--"
-        optimization_policy = "--"
-        latency_optimization_policy = "--"
-
-        kickoff = '--'
-        expected_row.extend([[translate_VLAN(vlan=vlan_id)],
-                             [protocol],
-                             [preoptimization_policy],
-                             [latency_optimization_policy],
-                             [optimization_policy],
-                             [cloud_acceleration],
-                             [kickoff],
-                             [status]])
-
-	
+
+        expected_row.extend(self.__expected_rule_suffix(
+            vlan_id, protocol, "--", "--", "--",
+            cloud_acceleration, KICKOFF_NONE, status))
+
+
         return expected_row
 
     def expected_discard_rule(self,
@@ -292,7 +291,7 @@ class PageVerification(Base):
                               vlan_id=None,
                               protocol='--',
                               status='Enabled',
-			      cloud_acceleration = None,
+                              cloud_acceleration = None,
                               **kwords):
         """
         Generate expected discard rule
@@ -313,29 +312,19 @@ class PageVerification(Base):
         expected_row = self.__expected_rule_prefix(
             'Discard', position, source_subnet, source_port,
             destination_subnet, destination_port)
-         
-        preoptimization_policy = "--"
-        optimization_policy = "--"
-        latency_optimization_policy = "--"
-        kickoff = '--'
-	cloud_acceleration = "--"
-        expected_row.extend([[translate_VLAN(vlan=vlan_id)],
-                             [protocol],
-                             [preoptimization_policy],
-                             [latency_optimization_policy],
-                             [optimization_policy],
-                             [cloud_acceleration],
-                             [kickoff],
-                             [status]])
+
+        expected_row.extend(self.__expected_rule_suffix(
+            vlan_id, protocol, "--", "--", "--",
+            "--", KICKOFF_NONE, status))
         return expected_row
-     
+
     def expected_deny_rule(self, type_of_rule=None, position=None,
                            source_subnet='all-IPv4',
                            destination_subnet='all-IPv4',
                            destination_port='*', vlan_id=None,
                            number_of_rules=None, protocol='--',
                            status='Enabled', source_port='*',
-			   cloud_acceleration=None,
+                           cloud_acceleration=None,
                            **kwords):
         """
         Generate expected deny rule
@@ -357,19 +346,9 @@ class PageVerification(Base):
         expected_row = self.__expected_rule_prefix(
             'Deny', position, source_subnet, source_port,
             destination_subnet, destination_port)
-         
-        preoptimization_policy = "--"
-        optimization_policy = "--"
-        latency_optimization_policy = "--"
-        kickoff = '--'
-        cloud_acceleration = "--"
-	expected_row.extend([[translate_VLAN(vlan=vlan_id)],
-                             [protocol],
-                             [preoptimization_policy],
-                             [latency_optimization_policy],
-                             [optimization_policy],
-                             [cloud_acceleration],
-                             [kickoff],
-                             [status]])
+
+        expected_row.extend(self.__expected_rule_suffix(
+            vlan_id, protocol, "--", "--", "--",
+            "--", KICKOFF_NONE, status))
 
         return expected_row